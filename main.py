@@ -2,13 +2,21 @@
 """TimeCloud CLI - Animated wordcloud generator with sliding window."""
 
 import argparse
+import itertools
+import os
 import sys
 from pathlib import Path
 
 from src.scraper import scrape_substack
 from src.timecloud import Config, TimeCloud, Tokenizer
 from src.renderers.debug import DebugRenderer, ProgressRenderer
-from src.renderers.video import VideoRenderer, FrameRenderer
+from src.renderers.video import VIDEO_ENCODERS, VideoRenderer, FrameRenderer
+
+
+def default_token_cache_dir() -> Path:
+    """Per-user token cache directory, under $XDG_CACHE_HOME or ~/.cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "timecloud" / "tokens"
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -110,6 +118,12 @@ Examples:
         default=2,
         help="Minimum word length to include (default: 2)",
     )
+    render_parser.add_argument(
+        "--no-token-cache",
+        action="store_true",
+        help="Re-tokenize every file instead of reusing cached tokens "
+        "from ~/.cache/timecloud/tokens",
+    )
 
     # Video output options
     render_parser.add_argument(
@@ -136,6 +150,29 @@ Examples:
         default=1080,
         help="Video height in pixels (default: 1080)",
     )
+    render_parser.add_argument(
+        "--encoder",
+        choices=["auto", *VIDEO_ENCODERS],
+        default="auto",
+        help="H.264 encoder; auto uses hardware encoding when available (default: auto)",
+    )
+    render_parser.add_argument(
+        "--preset",
+        default="veryfast",
+        help="libx264 encoding preset (default: veryfast)",
+    )
+    render_parser.add_argument(
+        "--crf",
+        type=int,
+        default=18,
+        help="Video quality, lower is better (default: 18)",
+    )
+    render_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for tokenizing and rendering (default: number of CPUs)",
+    )
 
     # Visual style options
     render_parser.add_argument(
@@ -214,6 +251,10 @@ def cmd_render(args) -> int:
         fps=args.fps,
         frame_width=args.width,
         frame_height=args.height,
+        video_encoder=args.encoder,
+        video_preset=args.preset,
+        video_crf=args.crf,
+        render_workers=args.workers,
         background_color=args.background_color,
         word_color=args.word_color,
         font_path=args.font_path,
@@ -222,6 +263,8 @@ def cmd_render(args) -> int:
         max_font_size=args.max_font_size,
         output_path=args.output,
         articles_dir=args.input_dir,
+        token_cache_dir=None if args.no_token_cache else default_token_cache_dir(),
+        tokenize_workers=args.workers,
     )
 
     # Find and sort article files
@@ -230,22 +273,26 @@ def cmd_render(args) -> int:
         print(f"Error: Input directory not found: {input_dir}")
         return 1
 
-    files = sorted(input_dir.glob("*.txt"))
+    # scandir + string sort avoids building and comparing a Path per entry
+    with os.scandir(input_dir) as entries:
+        names = sorted(e.name for e in entries if e.name.endswith(".txt") and e.is_file())
+    files = [input_dir / name for name in names]
     if not files:
         print(f"Error: No .txt files found in {input_dir}")
         return 1
 
     print(f"Found {len(files)} article files")
 
-    # Tokenize
+    # Tokenize lazily; words stream into the engine as files are read
     print("\nTokenizing...")
     tokenizer = Tokenizer(config)
     words = tokenizer.tokenize_files(files)
-    print(f"Total words after filtering: {len(words)}")
 
-    if not words:
+    first_word = next(words, None)
+    if first_word is None:
         print("Error: No words to process after filtering")
         return 1
+    words = itertools.chain([first_word], words)
 
     # Create engine
     cloud = TimeCloud(config)
@@ -262,16 +309,13 @@ def cmd_render(args) -> int:
         renderer = VideoRenderer(config)
 
     # Process words
-    print(f"\nProcessing {len(words)} words (batch size: {config.words_per_frame})...")
-
-    if config.words_per_frame == 1:
-        states = cloud.process_words(words)
-    else:
-        states = cloud.process_words_batched(words, config.words_per_frame)
+    print(f"\nProcessing words (batch size: {config.words_per_frame})...")
+    states = cloud.process_words(words)
 
     # Render
     renderer.render_all(states)
 
+    print(f"\nTotal words after filtering: {cloud.total_words_processed}")
     print("\nDone!")
     return 0
 
@@ -6,6 +6,9 @@ from typing import Any
 from ..timecloud.config import Config
 from ..timecloud.core import CloudState
 
+PROGRESS_INTERVAL = 0.1
+"""Minimum seconds between in-place progress updates on the terminal."""
+
 
 class BaseRenderer(ABC):
     """Abstract base class for TimeCloud renderers.
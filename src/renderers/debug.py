@@ -1,11 +1,12 @@
 """Debug renderer for terminal output."""
 
 import sys
+import time
 from typing import Any
 
 from ..timecloud.config import Config
 from ..timecloud.core import CloudState
-from .base import BaseRenderer
+from .base import PROGRESS_INTERVAL, BaseRenderer
 
 
 class DebugRenderer(BaseRenderer):
@@ -79,6 +80,10 @@ class ProgressRenderer(BaseRenderer):
         self.total_words = total_words
         self.state_count = 0
 
+        # Progress is redrawn in place, so skip it when not on a terminal
+        self._show_progress = sys.stdout.isatty()
+        self._last_progress = 0.0
+
     def render_state(self, state: CloudState) -> Any:
         """Update progress display.
 
@@ -90,6 +95,15 @@ class ProgressRenderer(BaseRenderer):
         """
         self.state_count += 1
 
+        if not self._show_progress:
+            return None
+
+        # Throttle by time: flushing the terminal every state is a syscall
+        now = time.monotonic()
+        if now - self._last_progress < PROGRESS_INTERVAL:
+            return None
+        self._last_progress = now
+
         if self.total_words:
             pct = (state.total_words_processed / self.total_words) * 100
             sys.stdout.write(
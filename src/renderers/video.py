@@ -1,38 +1,234 @@
 """Video renderer using wordcloud library and ffmpeg."""
 
-import math
+import io
+import multiprocessing
+import platform
 import shutil
 import subprocess
 import sys
-import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from multiprocessing.pool import AsyncResult
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+import numpy as np
 from PIL import Image
 from wordcloud import WordCloud
 
 from ..timecloud.config import Config
 from ..timecloud.core import CloudState
-from .base import BaseRenderer
+from .base import PROGRESS_INTERVAL, BaseRenderer
+
+LAYOUT_CACHE_BYTES = 512 * 1024 * 1024
+"""Memory budget for cached frames (about 85 frames at 1920x1080)."""
+
+VIDEO_ENCODERS = ("libx264", "h264_nvenc", "h264_qsv", "h264_videotoolbox")
+"""H.264 encoders the video renderer knows how to configure."""
+
+# Hardware encoders worth probing on each OS, in order of preference
+_HW_ENCODERS = {
+    "Linux": ("h264_nvenc", "h264_qsv"),
+    "Windows": ("h264_nvenc", "h264_qsv"),
+    "Darwin": ("h264_videotoolbox",),
+}
+
+STDERR_TAIL_LINES = 50
+"""Number of trailing ffmpeg stderr lines kept for error reports."""
+
+# Sentinel for layout cache misses (None is a valid cached blank frame)
+_MISS = object()
+
+# Per-process WordCloud used by render pool workers
+_worker_wc: WordCloud | None = None
+
+
+def _wordcloud_kwargs(config: Config) -> dict[str, Any]:
+    """Build WordCloud constructor arguments from config.
+
+    Args:
+        config: Configuration object with visual settings.
+
+    Returns:
+        Keyword arguments for WordCloud.
+    """
+    wc_kwargs = {
+        "width": config.frame_width,
+        "height": config.frame_height,
+        "background_color": config.background_color,
+        "color_func": lambda *args, **kwargs: config.word_color,
+        "min_font_size": config.min_font_size,
+        "max_font_size": config.max_font_size,
+        "prefer_horizontal": 0.7,
+        "relative_scaling": 0.5,
+        "margin": 10,
+    }
+
+    # Add font if specified
+    if config.font_path and config.font_path.exists():
+        wc_kwargs["font_path"] = str(config.font_path)
+
+    return wc_kwargs
+
+
+def _encoder_args(encoder: str, config: Config) -> list[str]:
+    """Build the ffmpeg codec and quality arguments for an encoder.
+
+    Args:
+        encoder: ffmpeg encoder name.
+        config: Configuration object with preset and quality settings.
+
+    Returns:
+        ffmpeg arguments selecting and tuning the encoder.
+    """
+    args = ["-c:v", encoder]
+    if encoder == "libx264":
+        args += ["-preset", config.video_preset, "-crf", str(config.video_crf)]
+    elif encoder == "h264_nvenc":
+        args += ["-cq", str(config.video_crf)]
+    elif encoder == "h264_qsv":
+        args += ["-global_quality", str(config.video_crf)]
+    elif encoder == "h264_videotoolbox":
+        # videotoolbox quality is 1-100, higher is better
+        args += ["-q:v", str(max(1, 100 - 2 * config.video_crf))]
+    return args
+
+
+def _detect_encoder(config: Config) -> str:
+    """Pick the first hardware encoder that works on this host.
+
+    ffmpeg builds often list hardware encoders the machine cannot use
+    (e.g. NVENC without an NVIDIA GPU), so each candidate is checked by
+    encoding a single test frame.
+
+    Args:
+        config: Configuration object with quality settings.
+
+    Returns:
+        Name of a working hardware encoder, or 'libx264'.
+    """
+    candidates = _HW_ENCODERS.get(platform.system(), ())
+    if not candidates:
+        return "libx264"
+
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True
+    )
+    for encoder in candidates:
+        if encoder not in result.stdout:
+            continue
+        cmd = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "color=black:s=256x256",
+            "-frames:v", "1",
+            *_encoder_args(encoder, config),
+            "-f", "null", "-",
+        ]
+        try:
+            probe = subprocess.run(cmd, capture_output=True, timeout=15)
+        except subprocess.TimeoutExpired:
+            continue
+        if probe.returncode == 0:
+            return encoder
+
+    return "libx264"
+
+
+def _scale_to_int_freqs(
+    freq_dict: dict[str, int], scale: str, mult: int = 1000
+) -> dict[str, int]:
+    """Scale word frequencies for display.
+
+    Applies logarithmic or linear scaling, then maps the result to
+    positive integers (wordcloud needs positive integers).
+
+    Args:
+        freq_dict: Raw word frequencies.
+        scale: Scaling method, 'log' or 'linear'.
+        mult: Integer resolution of the scaled values.
+
+    Returns:
+        Integer frequencies for wordcloud generation.
+    """
+    if not freq_dict:
+        return {}
+
+    words, freqs = zip(*freq_dict.items())
+    arr = np.asarray(freqs, dtype=np.float64)
+    max_freq = arr.max()
+    if max_freq == 0:
+        return {}
+
+    if scale == "log":
+        # Log scaling: log(freq + 1) to handle freq=1
+        scaled = np.log1p(arr) / np.log1p(max_freq)
+    else:
+        # Linear scaling
+        scaled = arr / max_freq
+
+    int_freqs = np.maximum(1, (scaled * mult).astype(np.int32))
+    return dict(zip(words, int_freqs.tolist()))
+
+
+def _render_frame(wc: WordCloud, int_freqs: dict[str, int] | None) -> bytes | None:
+    """Lay out one frame and return its raw RGB24 bytes.
+
+    Args:
+        wc: WordCloud instance to render with.
+        int_freqs: Integer word frequencies, or None for an empty frame.
+
+    Returns:
+        Raw frame bytes, or None if the frame should be blank.
+    """
+    if not int_freqs:
+        return None
+
+    try:
+        wc.generate_from_frequencies(int_freqs)
+        # to_array() is np.array(to_image()), so going through PIL
+        # directly is the cheaper path to raw bytes.
+        return wc.to_image().tobytes()
+    except ValueError as e:
+        # wordcloud can fail with too few words
+        print(f"\nWarning: WordCloud generation failed: {e}")
+        return None
+
+
+def _resolve(frame: AsyncResult | bytes | None) -> bytes | None:
+    """Wait for a pending frame from the render pool if needed."""
+    if isinstance(frame, AsyncResult):
+        return frame.get()
+    return frame
+
+
+def _init_worker(config: Config) -> None:
+    """Create the WordCloud instance for a render pool worker."""
+    global _worker_wc
+    _worker_wc = WordCloud(**_wordcloud_kwargs(config))
+
+
+def _render_one(int_freqs: dict[str, int] | None) -> bytes | None:
+    """Render a single frame inside a pool worker."""
+    return _render_frame(_worker_wc, int_freqs)
 
 
 class VideoRenderer(BaseRenderer):
     """Renders CloudState frames to video using wordcloud + ffmpeg.
 
-    Generates individual frames as PNG images, then combines them
-    into an MP4 video using ffmpeg.
+    Frames are streamed as raw RGB24 data to a long-running ffmpeg
+    process over stdin, so encoding runs concurrently with frame
+    generation and no intermediate images are written to disk.
     """
 
     def __init__(self, config: Config):
-        """Initialize video renderer.
+        """Initialize video renderer and start the ffmpeg encoder.
 
         Args:
             config: Configuration object with visual and output settings.
         """
         super().__init__(config)
 
-        # Create temp directory for frames
-        self.temp_dir = Path(tempfile.mkdtemp(prefix="timecloud_"))
         self.frame_count = 0
 
         # Check ffmpeg availability
@@ -42,52 +238,96 @@ class VideoRenderer(BaseRenderer):
             )
 
         # Configure wordcloud generator
-        self.wc_kwargs = {
-            "width": config.frame_width,
-            "height": config.frame_height,
-            "background_color": config.background_color,
-            "color_func": lambda *args, **kwargs: config.word_color,
-            "min_font_size": config.min_font_size,
-            "max_font_size": config.max_font_size,
-            "prefer_horizontal": 0.7,
-            "relative_scaling": 0.5,
-            "margin": 10,
-        }
+        self.wc_kwargs = _wordcloud_kwargs(config)
 
-        # Add font if specified
-        if config.font_path and config.font_path.exists():
-            self.wc_kwargs["font_path"] = str(config.font_path)
+        # Reuse one generator and one blank frame for every state
+        self._wc = WordCloud(**self.wc_kwargs)
+        self._blank = Image.new(
+            "RGB",
+            (config.frame_width, config.frame_height),
+            config.background_color,
+        ).tobytes()
 
-        print(f"VideoRenderer initialized. Frames will be saved to: {self.temp_dir}")
+        # LRU cache of rendered frames keyed by their integer frequencies
+        self._layout_cache: OrderedDict[tuple, Any] = OrderedDict()
+        self._layout_cache_size = max(1, LAYOUT_CACHE_BYTES // len(self._blank))
 
-    def _scale_frequencies(self, frequencies: dict[str, int]) -> dict[str, float]:
-        """Scale word frequencies for display.
+        # Previous state's top words and frame, for repeated frames
+        self._last_top_words: list[tuple[str, int]] | None = None
+        self._last_frame: Any = None
 
-        Applies logarithmic or linear scaling based on config.
+        output_path = config.output_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        Args:
-            frequencies: Raw word frequencies.
+        encoder = config.video_encoder
+        if encoder == "auto":
+            encoder = _detect_encoder(config)
 
-        Returns:
-            Scaled frequencies for wordcloud generation.
-        """
-        if not frequencies:
-            return {}
+        # ffmpeg reads raw frames from stdin
+        width, height = config.frame_width, config.frame_height
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output
+            "-loglevel", "error",
+            "-stats",  # Progress lines only, no banner or stream info
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-r", str(config.fps),
+            "-i", "-",
+            *_encoder_args(encoder, config),
+            "-pix_fmt", "yuv420p",  # Compatibility
+            str(output_path),
+        ]
+
+        print(f"Running: {' '.join(cmd)}")
 
-        max_freq = max(frequencies.values())
-        if max_freq == 0:
-            return {}
+        # Unbuffered: frames are written straight from their bytes object
+        # instead of being copied into a BufferedWriter first.
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
 
-        scaled = {}
-        for word, freq in frequencies.items():
-            if self.config.size_scale == "log":
-                # Log scaling: log(freq + 1) to handle freq=1
-                scaled[word] = math.log(freq + 1) / math.log(max_freq + 1)
-            else:
-                # Linear scaling
-                scaled[word] = freq / max_freq
+        # Drain ffmpeg's stderr as it runs: show its progress and keep only
+        # the last few other lines for error reports.
+        self._stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
 
-        return scaled
+    def _frame_for(self, state: CloudState, render: Callable[[dict[str, int]], Any]) -> Any:
+        """Get the frame for a state, rendering it only if it is new.
+
+        A state whose top words match the previous state re-emits the
+        previous frame without scaling or a cache lookup; other states go
+        through the layout cache and call ``render`` on a miss.
+
+        Args:
+            state: Current cloud state.
+            render: Produces a frame (bytes, None, or a pending AsyncResult)
+                from integer frequencies.
+
+        Returns:
+            Frame bytes, None for a blank frame, or a pending AsyncResult.
+        """
+        top_words = state.top_words
+        if top_words == self._last_top_words:
+            return self._last_frame
+
+        frame = None
+        if top_words:
+            int_freqs = _scale_to_int_freqs(dict(top_words), self.config.size_scale)
+            key = tuple(sorted(int_freqs.items()))
+            frame = self._cache_get(key)
+            if frame is _MISS:
+                frame = render(int_freqs)
+                self._cache_put(key, frame)
+
+        self._last_top_words = top_words
+        self._last_frame = frame
+        return frame
 
     def render_state(self, state: CloudState) -> Any:
         """Render a single frame.
@@ -96,91 +336,149 @@ class VideoRenderer(BaseRenderer):
             state: Current cloud state.
 
         Returns:
-            Path to the generated frame image.
+            None
         """
-        self.frame_count += 1
+        frame = self._frame_for(state, lambda int_freqs: _render_frame(self._wc, int_freqs))
+        self._emit_frame(frame)
+        return None
 
-        # Progress output
-        if self.frame_count % 100 == 0:
-            sys.stdout.write(f"\rRendering frame {self.frame_count}...")
-            sys.stdout.flush()
+    def render_all(self, states) -> None:
+        """Render all states, laying out frames in parallel worker processes.
 
-        # Handle empty state
-        if not state.top_words:
-            # Create blank frame
-            img = Image.new(
-                "RGB",
-                (self.config.frame_width, self.config.frame_height),
-                self.config.background_color,
-            )
-        else:
-            # Build frequency dict from top words
-            freq_dict = dict(state.top_words)
+        With config.render_workers above 1, frames are dispatched to a
+        process pool and written to ffmpeg in their original order; with 1,
+        they are rendered in-process. At most a few frames per worker are
+        in flight at once, which bounds memory when ffmpeg falls behind.
+        Layouts already in the cache (including ones still being rendered)
+        are reused instead of being dispatched again.
 
-            # Scale frequencies
-            scaled = self._scale_frequencies(freq_dict)
+        Workers are spawned, so they import the caller's main module: a
+        script that calls this with more than one worker must guard its
+        entry point with ``if __name__ == "__main__":``.
 
-            # Convert scaled values back to integers for wordcloud
-            # (wordcloud needs positive integers)
-            int_freqs = {w: max(1, int(v * 1000)) for w, v in scaled.items()}
+        Args:
+            states: Iterator of CloudState objects.
+        """
+        workers = self.config.render_workers
+        if workers <= 1:
+            super().render_all(states)
+            return
 
-            try:
-                wc = WordCloud(**self.wc_kwargs)
-                wc.generate_from_frequencies(int_freqs)
-                img = wc.to_image()
-            except ValueError as e:
-                # wordcloud can fail with too few words
-                print(f"\nWarning: WordCloud generation failed: {e}")
-                img = Image.new(
-                    "RGB",
-                    (self.config.frame_width, self.config.frame_height),
-                    self.config.background_color,
-                )
-
-        # Save frame
-        frame_path = self.temp_dir / f"frame_{self.frame_count:08d}.png"
-        img.save(frame_path)
+        pending: deque[AsyncResult | bytes | None] = deque()
+        max_pending = workers * 4
 
-        return frame_path
+        # Spawn, not fork: ffmpeg and the stderr thread are already running,
+        # and forked workers would inherit ffmpeg's stdin pipe and any lock
+        # the thread holds (such as stdout's)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers, initializer=_init_worker, initargs=(self.config,)) as pool:
 
-    def finalize(self) -> None:
-        """Encode frames to video using ffmpeg."""
-        print(f"\n\nEncoding {self.frame_count} frames to video...")
+            def dispatch(int_freqs: dict[str, int]) -> AsyncResult:
+                return pool.apply_async(_render_one, (int_freqs,))
 
-        output_path = self.config.output_path
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+            for state in states:
+                pending.append(self._frame_for(state, dispatch))
+                if len(pending) >= max_pending:
+                    self._emit_frame(_resolve(pending.popleft()))
+            while pending:
+                self._emit_frame(_resolve(pending.popleft()))
 
-        # ffmpeg command
-        cmd = [
-            "ffmpeg",
-            "-y",  # Overwrite output
-            "-framerate", str(self.config.fps),
-            "-i", str(self.temp_dir / "frame_%08d.png"),
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",  # Compatibility
-            "-crf", "18",  # High quality
-            "-preset", "medium",
-            str(output_path),
-        ]
+        self.finalize()
 
-        print(f"Running: {' '.join(cmd)}")
+    def _cache_get(self, key: tuple) -> Any:
+        """Look up a cached layout, marking it as recently used.
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        Args:
+            key: Sorted (word, frequency) pairs of the frame.
+
+        Returns:
+            The cached frame (bytes, None, or a pending AsyncResult),
+            or _MISS if the layout is not cached.
+        """
+        frame = self._layout_cache.get(key, _MISS)
+        if frame is not _MISS:
+            self._layout_cache.move_to_end(key)
+        return frame
 
-        if result.returncode != 0:
-            print(f"ffmpeg error: {result.stderr}")
-            raise RuntimeError(f"ffmpeg failed with code {result.returncode}")
+    def _cache_put(self, key: tuple, frame: Any) -> None:
+        """Store a layout, evicting the least recently used entry if full.
 
-        print(f"\nVideo saved to: {output_path}")
-        print(f"Duration: {self.frame_count / self.config.fps:.1f} seconds")
+        Args:
+            key: Sorted (word, frequency) pairs of the frame.
+            frame: Frame bytes, None, or a pending AsyncResult.
+        """
+        self._layout_cache[key] = frame
+        if len(self._layout_cache) > self._layout_cache_size:
+            self._layout_cache.popitem(last=False)
+
+    def _emit_frame(self, frame: bytes | None) -> None:
+        """Count a rendered frame and send it to ffmpeg.
+
+        Args:
+            frame: Raw frame bytes, or None for a blank frame.
+        """
+        self.frame_count += 1
+        self._write_frame(self._blank if frame is None else frame)
 
-        # Cleanup temp directory
-        self._cleanup()
+    def _write_frame(self, frame: bytes) -> None:
+        """Send one raw RGB24 frame to the ffmpeg encoder.
 
-    def _cleanup(self) -> None:
-        """Remove temporary frame files."""
-        print(f"Cleaning up {self.temp_dir}...")
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        Args:
+            frame: Raw frame bytes (width * height * 3).
+        """
+        view = memoryview(frame)
+        try:
+            # Raw pipe writes may be partial
+            while view:
+                view = view[self.proc.stdin.write(view):]
+        except BrokenPipeError:
+            self._wait_encoder()
+            raise RuntimeError(f"ffmpeg exited early with code {self.proc.returncode}")
+
+    def _drain_stderr(self) -> None:
+        """Read ffmpeg's stderr line by line until it exits.
+
+        Runs on a background thread. ``frame=`` progress lines are echoed
+        in place (throttled, and only on a terminal); everything else is
+        kept in a bounded tail buffer.
+        """
+        # Progress is redrawn in place, so skip it when not on a terminal
+        show_progress = sys.stdout.isatty()
+        last_progress = 0.0
+
+        # Universal newlines split ffmpeg's carriage-return progress updates
+        with io.TextIOWrapper(self.proc.stderr, errors="replace") as stream:
+            for line in stream:
+                line = line.strip()
+                if line.startswith("frame="):
+                    now = time.monotonic()
+                    if show_progress and now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        sys.stdout.write(f"\rEncoding: {line}")
+                        sys.stdout.flush()
+                elif line:
+                    self._stderr_tail.append(line)
+
+    def _wait_encoder(self) -> None:
+        """Wait for ffmpeg to exit and report its errors if it failed."""
+        self.proc.wait()
+        self._stderr_thread.join()
+
+        if self.proc.returncode != 0:
+            print("\nffmpeg error:\n" + "\n".join(self._stderr_tail))
+
+    def finalize(self) -> None:
+        """Flush remaining frames and wait for ffmpeg to finish encoding."""
+        print(f"\n\nFinishing encode of {self.frame_count} frames...")
+
+        self.proc.stdin.close()
+        self._wait_encoder()
+
+        if self.proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed with code {self.proc.returncode}")
+
+        print(f"\nVideo saved to: {self.config.output_path}")
+        print(f"Duration: {self.frame_count / self.config.fps:.1f} seconds")
 
 
 class FrameRenderer(BaseRenderer):
@@ -202,20 +500,14 @@ class FrameRenderer(BaseRenderer):
         self.frame_count = 0
 
         # Configure wordcloud (same as VideoRenderer)
-        self.wc_kwargs = {
-            "width": config.frame_width,
-            "height": config.frame_height,
-            "background_color": config.background_color,
-            "color_func": lambda *args, **kwargs: config.word_color,
-            "min_font_size": config.min_font_size,
-            "max_font_size": config.max_font_size,
-            "prefer_horizontal": 0.7,
-            "relative_scaling": 0.5,
-            "margin": 10,
-        }
-
-        if config.font_path and config.font_path.exists():
-            self.wc_kwargs["font_path"] = str(config.font_path)
+        self.wc_kwargs = _wordcloud_kwargs(config)
+
+        self._wc = WordCloud(**self.wc_kwargs)
+        self._blank = Image.new(
+            "RGB",
+            (config.frame_width, config.frame_height),
+            config.background_color,
+        )
 
     def render_state(self, state: CloudState) -> Any:
         """Render and save a single frame.
@@ -229,36 +521,20 @@ class FrameRenderer(BaseRenderer):
         self.frame_count += 1
 
         if not state.top_words:
-            img = Image.new(
-                "RGB",
-                (self.config.frame_width, self.config.frame_height),
-                self.config.background_color,
-            )
+            img = self._blank
         else:
-            freq_dict = dict(state.top_words)
-            max_freq = max(freq_dict.values()) if freq_dict else 1
-
-            if self.config.size_scale == "log":
-                scaled = {
-                    w: max(1, int(math.log(f + 1) / math.log(max_freq + 1) * 1000))
-                    for w, f in freq_dict.items()
-                }
-            else:
-                scaled = {w: max(1, int(f / max_freq * 1000)) for w, f in freq_dict.items()}
+            scaled = _scale_to_int_freqs(dict(state.top_words), self.config.size_scale)
 
             try:
-                wc = WordCloud(**self.wc_kwargs)
-                wc.generate_from_frequencies(scaled)
-                img = wc.to_image()
+                self._wc.generate_from_frequencies(scaled)
+                img = self._wc.to_image()
             except ValueError:
-                img = Image.new(
-                    "RGB",
-                    (self.config.frame_width, self.config.frame_height),
-                    self.config.background_color,
-                )
+                img = self._blank
 
+        # PNG is lossless, so the fastest zlib level only trades disk space
+        # for encode time (the default level 6 is several times slower)
         frame_path = self.output_dir / f"frame_{self.frame_count:08d}.png"
-        img.save(frame_path)
+        img.save(frame_path, format="PNG", compress_level=1)
 
         if self.frame_count % 100 == 0:
             print(f"Saved frame {self.frame_count}")
@@ -2,25 +2,67 @@
 
 import re
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser as HTMLParser, LexborNode as Node
 
+MAX_WORKERS = 8
+"""Number of articles fetched concurrently."""
 
-def get_archive_urls(base_url: str) -> list[dict]:
+CACHE_PATH = ".cache/scraper"
+"""On-disk HTTP cache used by make_session()."""
+
+CACHE_EXPIRE_SECONDS = 86400
+"""How long cached pages are reused before being fetched again."""
+
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_DASH = re.compile(r"[-\s]+")
+_POST_PREVIEW_RE = re.compile(r"post-preview")
+
+# Human-readable date formats; ISO-8601 is handled by fromisoformat
+_DATE_FORMATS = (
+    "%B %d, %Y",
+    "%b %d, %Y",
+)
+
+
+def make_session() -> requests.Session:
+    """Create a disk-cached HTTP session with a keep-alive connection pool.
+
+    Responses are cached under CACHE_PATH for CACHE_EXPIRE_SECONDS, so
+    re-running a scrape reads unchanged pages from disk instead of the
+    network.
+
+    Returns:
+        Session whose pool can serve MAX_WORKERS concurrent requests.
+    """
+    session = requests_cache.CachedSession(CACHE_PATH, expire_after=CACHE_EXPIRE_SECONDS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_archive_urls(base_url: str, session: requests.Session | None = None) -> list[dict]:
     """Fetch all article URLs from a Substack archive.
 
     Args:
         base_url: Base URL of the Substack (e.g., 'https://example.substack.com')
+        session: Optional session to reuse connections. Defaults to plain requests.
 
     Returns:
         List of dicts with 'url', 'title', 'date' keys, sorted by date ascending.
     """
+    http = session or requests
     archive_url = urljoin(base_url.rstrip("/") + "/", "archive")
     articles = []
+    seen_urls: set[str] = set()
 
     # Substack archive pages can have pagination, but most small substacks
     # show all posts on a single page. We'll handle basic pagination.
@@ -29,55 +71,57 @@ def get_archive_urls(base_url: str) -> list[dict]:
         url = f"{archive_url}?page={page}" if page > 1 else archive_url
         print(f"Fetching archive page {page}...")
 
-        response = requests.get(url, timeout=30)
+        response = http.get(url, timeout=30)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        tree = HTMLParser(response.text)
 
         # Find article links - Substack uses various class patterns
-        post_links = soup.select('a[data-testid="post-preview-title"]')
+        post_links = tree.css('a[data-testid="post-preview-title"]')
         if not post_links:
             # Try alternative selector
-            post_links = soup.select("a.post-preview-title")
+            post_links = tree.css("a.post-preview-title")
         if not post_links:
             # Try finding links within post preview containers
-            post_links = soup.select('div[class*="post-preview"] a[href*="/p/"]')
+            post_links = tree.css('div[class*="post-preview"] a[href*="/p/"]')
 
         if not post_links:
             break
 
         found_new = False
         for link in post_links:
-            href = link.get("href", "")
+            href = link.attributes.get("href") or ""
             if "/p/" not in href:
                 continue
 
             full_url = urljoin(base_url, href)
-            if any(a["url"] == full_url for a in articles):
+            if full_url in seen_urls:
                 continue
 
             found_new = True
-            title = link.get_text(strip=True)
+            title = link.text(strip=True)
 
             # Try to find the date - look in parent containers
             date_str = None
-            parent = link.find_parent(class_=re.compile(r"post-preview"))
-            if parent:
-                time_elem = parent.find("time")
-                if time_elem:
-                    date_str = time_elem.get("datetime") or time_elem.get_text(strip=True)
+            parent = _find_parent(link, _POST_PREVIEW_RE)
+            if parent is not None:
+                time_elem = parent.css_first("time")
+                if time_elem is not None:
+                    date_str = time_elem.attributes.get("datetime") or time_elem.text(strip=True)
 
             articles.append({
                 "url": full_url,
                 "title": title,
                 "date_str": date_str,
             })
+            seen_urls.add(full_url)
 
         if not found_new:
             break
 
         page += 1
-        time.sleep(0.5)  # Be polite
+        if not getattr(response, "from_cache", False):
+            time.sleep(0.5)  # Be polite
 
     # Parse dates and sort
     for article in articles:
@@ -88,78 +132,97 @@ def get_archive_urls(base_url: str) -> list[dict]:
     return articles
 
 
+def _find_parent(node: Node, class_pattern: re.Pattern) -> Node | None:
+    """Find the closest ancestor whose class attribute matches a pattern.
+
+    Args:
+        node: Node to start from.
+        class_pattern: Regex searched against the ancestor's class attribute.
+
+    Returns:
+        The matching ancestor, or None if there is none.
+    """
+    parent = node.parent
+    while parent is not None:
+        if class_pattern.search(parent.attributes.get("class") or ""):
+            return parent
+        parent = parent.parent
+    return None
+
+
 def parse_date(date_str: str | None) -> datetime | None:
     """Parse various date string formats."""
     if not date_str:
         return None
 
-    # Common formats
-    formats = [
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%d",
-        "%B %d, %Y",
-        "%b %d, %Y",
-    ]
+    date_str = date_str.strip()
+
+    # Fast path: Substack's ISO-8601 timestamps. Strip the 'Z' so results
+    # stay naive like the strptime formats below and sort together.
+    try:
+        parsed = datetime.fromisoformat(date_str.removesuffix("Z"))
+    except ValueError:
+        pass
+    else:
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
 
-    for fmt in formats:
+    for fmt in _DATE_FORMATS:
         try:
-            return datetime.strptime(date_str.strip(), fmt)
+            return datetime.strptime(date_str, fmt)
         except ValueError:
             continue
 
     return None
 
 
-def scrape_article(url: str) -> str:
+def scrape_article(url: str, session: requests.Session | None = None) -> str:
     """Scrape the body text from a single Substack article.
 
     Args:
         url: Full URL of the article.
+        session: Optional session to reuse connections. Defaults to plain requests.
 
     Returns:
         Plain text content of the article body.
     """
     print(f"Scraping: {url}")
 
-    response = requests.get(url, timeout=30)
+    http = session or requests
+    response = http.get(url, timeout=30)
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    tree = HTMLParser(response.text)
+
+    # Remove script, style, and other non-content elements
+    tree.strip_tags(["script", "style", "nav", "footer", "button"])
 
     # Substack article body is typically in a div with class containing 'body'
     # or in the main content area
-    body = soup.select_one('div[class*="body"]')
-    if not body:
-        body = soup.select_one("article")
-    if not body:
-        body = soup.select_one('div[class*="post-content"]')
-    if not body:
+    body = tree.css_first('div[class*="body"]')
+    if body is None:
+        body = tree.css_first("article")
+    if body is None:
+        body = tree.css_first('div[class*="post-content"]')
+    if body is None:
         # Fallback: get main content
-        body = soup.select_one("main")
+        body = tree.css_first("main")
 
-    if not body:
+    if body is None:
         print(f"  Warning: Could not find article body for {url}")
         return ""
 
-    # Remove script, style, and other non-content elements
-    for tag in body.find_all(["script", "style", "nav", "footer", "button"]):
-        tag.decompose()
-
-    # Extract text
-    text = body.get_text(separator=" ", strip=True)
-
-    # Clean up whitespace
-    text = re.sub(r"\s+", " ", text)
-
-    return text
+    # Extract text, collapsing whitespace runs (including newlines inside
+    # text nodes) to single spaces in one C-level pass
+    return " ".join(body.text(separator=" ").split())
 
 
 def slugify(text: str) -> str:
     """Convert text to a filesystem-safe slug."""
     text = text.lower()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[-\s]+", "-", text)
+    text = _SLUG_STRIP.sub("", text)
+    text = _SLUG_DASH.sub("-", text)
     return text.strip("-")[:50]
 
 
@@ -175,32 +238,35 @@ def scrape_substack(base_url: str, output_dir: Path) -> list[Path]:
     """
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    articles = get_archive_urls(base_url)
+    session = make_session()
+    articles = get_archive_urls(base_url, session)
     print(f"Found {len(articles)} articles")
 
     created_files = []
 
-    for i, article in enumerate(articles, 1):
-        print(f"\n[{i}/{len(articles)}] {article['title']}")
+    # Fetch articles concurrently over the shared connection pool;
+    # map() yields results in archive order.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        texts = executor.map(lambda a: scrape_article(a["url"], session), articles)
 
-        text = scrape_article(article["url"])
-        if not text:
-            continue
+        for i, (article, text) in enumerate(zip(articles, texts), 1):
+            print(f"\n[{i}/{len(articles)}] {article['title']}")
 
-        # Create filename with date prefix for sorting
-        date_prefix = "0000-00-00"
-        if article["date"]:
-            date_prefix = article["date"].strftime("%Y-%m-%d")
+            if not text:
+                continue
 
-        slug = slugify(article["title"])
-        filename = f"{date_prefix}_{slug}.txt"
-        filepath = output_dir / filename
+            # Create filename with date prefix for sorting
+            date_prefix = "0000-00-00"
+            if article["date"]:
+                date_prefix = article["date"].strftime("%Y-%m-%d")
 
-        filepath.write_text(text, encoding="utf-8")
-        created_files.append(filepath)
-        print(f"  Saved: {filename} ({len(text)} chars)")
+            slug = slugify(article["title"])
+            filename = f"{date_prefix}_{slug}.txt"
+            filepath = output_dir / filename
 
-        time.sleep(0.5)  # Be polite
+            filepath.write_text(text, encoding="utf-8")
+            created_files.append(filepath)
+            print(f"  Saved: {filename} ({len(text)} chars)")
 
     return created_files
 
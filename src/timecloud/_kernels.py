@@ -0,0 +1,162 @@
+"""Sliding window kernels over word id arrays.
+
+The window is a ring buffer of int32 word ids and the counts are an int32
+array indexed by word id. When Numba is installed these kernels are
+compiled to native code; otherwise they fall back to vectorized NumPy
+(or plain Python for runs too short to amortize NumPy's call overhead).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Below this many ids, the plain Python loop beats the NumPy fallback
+_VECTORIZE_MIN_IDS = 16
+
+
+def _advance_window(ids: np.ndarray, ring: np.ndarray, counts: np.ndarray, head: int) -> int:
+    """Push word ids into the ring buffer, updating counts in place.
+
+    Args:
+        ids: Word ids to add, in order.
+        ring: Ring buffer of word ids, -1 for empty slots.
+        counts: Window counts indexed by word id.
+        head: Slot of the oldest word, which the next id overwrites.
+
+    Returns:
+        The new head slot.
+    """
+    size = ring.shape[0]
+    for i in range(ids.shape[0]):
+        evicted = ring[head]
+        if evicted >= 0:
+            counts[evicted] -= 1
+        wid = ids[i]
+        ring[head] = wid
+        counts[wid] += 1
+        head += 1
+        if head == size:
+            head = 0
+    return head
+
+
+def _top_k_ids(ring: np.ndarray, counts: np.ndarray, k: int) -> np.ndarray:
+    """Ids of the k most frequent words in the window, in no particular order.
+
+    Ties at the cutoff go to the lower word id, i.e. the word seen first.
+    Only words in the ring can have a nonzero count, so this scans the ring
+    rather than the whole vocabulary, keeping a size-k min-heap of counts.
+    Visited ids are marked by negating their count, then restored.
+
+    Args:
+        ring: Ring buffer of word ids, -1 for empty slots.
+        counts: Window counts indexed by word id.
+        k: Number of ids to return (fewer if the window has fewer words).
+
+    Returns:
+        Array of up to k word ids.
+    """
+    heap_counts = np.empty(max(k, 0), np.int32)
+    heap_ids = np.empty(max(k, 0), np.int32)
+    size = 0
+    if k <= 0:
+        return heap_ids
+
+    for slot in range(ring.shape[0]):
+        wid = ring[slot]
+        if wid < 0:
+            continue
+        count = counts[wid]
+        if count <= 0:
+            continue  # Already visited
+        counts[wid] = -count
+
+        # Heap order: lower count is weaker; on equal counts the higher
+        # (later-seen) id is weaker, so ties go to the lower id
+        if size < k:
+            # Sift up from the new leaf
+            i = size
+            size += 1
+            while i > 0:
+                parent = (i - 1) >> 1
+                pc = heap_counts[parent]
+                if pc < count or (pc == count and heap_ids[parent] > wid):
+                    break
+                heap_counts[i] = heap_counts[parent]
+                heap_ids[i] = heap_ids[parent]
+                i = parent
+        elif count > heap_counts[0] or (count == heap_counts[0] and wid < heap_ids[0]):
+            # Replace the weakest and sift down from the root
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size:
+                    c1 = heap_counts[child + 1]
+                    c0 = heap_counts[child]
+                    if c1 < c0 or (c1 == c0 and heap_ids[child + 1] > heap_ids[child]):
+                        child += 1
+                cc = heap_counts[child]
+                if cc > count or (cc == count and heap_ids[child] < wid):
+                    break
+                heap_counts[i] = heap_counts[child]
+                heap_ids[i] = heap_ids[child]
+                i = child
+        else:
+            continue
+        heap_counts[i] = count
+        heap_ids[i] = wid
+
+    for slot in range(ring.shape[0]):
+        wid = ring[slot]
+        if wid >= 0 and counts[wid] < 0:
+            counts[wid] = -counts[wid]
+
+    return heap_ids[:size]
+
+
+if njit is not None:
+    advance_window = njit(cache=True)(_advance_window)
+    top_k_ids = njit(cache=True)(_top_k_ids)
+else:
+
+    def advance_window(ids: np.ndarray, ring: np.ndarray, counts: np.ndarray, head: int) -> int:
+        """Vectorized equivalent of _advance_window for use without Numba."""
+        n = len(ids)
+        if n < _VECTORIZE_MIN_IDS:
+            return _advance_window(ids, ring, counts, head)
+
+        size = len(ring)
+        new_head = (head + n) % size
+        if n >= size:
+            # Everything in the window is evicted, and only the last `size`
+            # ids survive; earlier ids are added and evicted within the run
+            np.subtract.at(counts, ring[ring >= 0], 1)
+            ids = ids[n - size:]
+            ring[:] = np.roll(ids, new_head)
+        else:
+            slots = (head + np.arange(n)) % size
+            evicted = ring[slots]
+            np.subtract.at(counts, evicted[evicted >= 0], 1)
+            ring[slots] = ids
+        np.add.at(counts, ids, 1)
+        return new_head
+
+    def top_k_ids(ring: np.ndarray, counts: np.ndarray, k: int) -> np.ndarray:
+        """Vectorized equivalent of _top_k_ids for use without Numba."""
+        ids = np.unique(ring[ring >= 0])
+        if k <= 0:
+            return ids[:0]
+        if len(ids) <= k:
+            return ids
+        # Linear-time selection of the k-th largest count; ids tied at it
+        # are taken lowest first (ids are sorted), matching the heap's rule
+        window_counts = counts[ids]
+        kth = window_counts[np.argpartition(-window_counts, k - 1)[k - 1]]
+        above = ids[window_counts > kth]
+        tied = ids[window_counts == kth]
+        return np.concatenate((above, tied[: k - len(above)]))
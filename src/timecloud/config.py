@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """Configuration for TimeCloud engine and renderers.
 
@@ -35,6 +35,12 @@ class Config:
     min_word_length: int = 2
     """Minimum word length to include."""
 
+    token_cache_dir: Path | None = None
+    """Directory for cached (pickled) per-file token lists, or None for no cache."""
+
+    tokenize_workers: int = 1
+    """Processes tokenizing large uncached inputs; above 1 needs a __main__ guard (see README)."""
+
     # === Video Output Options ===
     words_per_frame: int = 1
     """Number of words to process before rendering a frame."""
@@ -48,6 +54,18 @@ class Config:
     frame_height: int = 1080
     """Video height in pixels."""
 
+    video_encoder: str = "auto"
+    """ffmpeg H.264 encoder. 'auto' picks a working hardware encoder, else libx264."""
+
+    video_preset: str = "veryfast"
+    """libx264 preset (e.g. 'ultrafast' for drafts, 'medium' for smaller files)."""
+
+    video_crf: int = 18
+    """Constant quality level (lower is better; 18 is visually lossless)."""
+
+    render_workers: int = 1
+    """Processes laying out video frames; above 1 needs a __main__ guard (see README)."""
+
     # === Visual Style Options ===
     background_color: str = "#FAF9F6"
     """Background color (hex or color name). Default is off-white."""
@@ -77,17 +95,20 @@ class Config:
     articles_dir: Path = field(default_factory=lambda: Path("articles"))
     """Directory containing article text files."""
 
+    # Fields that accept a str and are converted to Path
+    _PATH_FIELDS = ("stopwords_file", "token_cache_dir", "font_path", "output_path", "articles_dir")
+
     def __post_init__(self):
         """Convert string paths to Path objects if needed."""
-        if isinstance(self.stopwords_file, str):
-            self.stopwords_file = Path(self.stopwords_file)
-        if isinstance(self.font_path, str):
-            self.font_path = Path(self.font_path)
-        if isinstance(self.output_path, str):
-            self.output_path = Path(self.output_path)
-        if isinstance(self.articles_dir, str):
-            self.articles_dir = Path(self.articles_dir)
+        for name in self._PATH_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, Path(value))
 
         # Validate size_scale
         if self.size_scale not in ("log", "linear"):
             raise ValueError(f"size_scale must be 'log' or 'linear', got '{self.size_scale}'")
+
+        for name in ("tokenize_workers", "render_workers"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1, got {getattr(self, name)}")
@@ -1,24 +1,34 @@
 """TimeCloud core engine - sliding window word frequency tracking."""
 
-from collections import Counter, deque
-from dataclasses import dataclass
-from typing import Iterator
+import weakref
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Mapping
 
+import numpy as np
+
+from ._kernels import advance_window, top_k_ids
 from .config import Config
 
+# Top-K keys pack (-count, word id) into one int, which sorts and compares
+# faster than a tuple; word ids fit in int32
+_KEY_STRIDE = 1 << 32
+
 
-@dataclass
+@dataclass(slots=True)
 class CloudState:
     """Represents the state of the word cloud at a point in time.
 
     This is the data structure passed to renderers.
     """
 
-    word_frequencies: dict[str, int]
-    """All word frequencies in the current sliding window."""
+    word_frequencies: Mapping[str, int]
+    """All word frequencies in the current sliding window.
 
-    top_words: list[tuple[str, int]]
-    """Top N words by frequency, for display. List of (word, count) tuples."""
+    For the states yielded by process_words this is a read-only live view
+    of the engine's counts (not a copy), so it reflects later additions.
+    States from get_state() and add_word() hold their own copy.
+    """
 
     total_words_processed: int
     """Total number of words processed so far (not just in window)."""
@@ -29,6 +39,53 @@ class CloudState:
     latest_word: str | None
     """The most recently added word (for highlighting in renders)."""
 
+    _top_words: list[tuple[str, int]] | None = field(default=None, repr=False, compare=False)
+    """Top words, or None until first computed from _engine."""
+
+    _engine: "weakref.ref[TimeCloud] | None" = field(default=None, repr=False, compare=False)
+    """Engine to compute top words from on first access, if not given."""
+
+    @property
+    def top_words(self) -> list[tuple[str, int]]:
+        """Top N words by frequency, for display. List of (word, count) tuples.
+
+        Computed on first access when the state came from process_words,
+        so renderers that never read it skip the top-K work.
+        """
+        if self._top_words is None:
+            engine = self._engine() if self._engine is not None else None
+            self._top_words = engine.get_top_words() if engine is not None else []
+        return self._top_words
+
+
+class _WordFrequencies(Mapping[str, int]):
+    """Read-only live view of an engine's window counts, keyed by word."""
+
+    __slots__ = ("_cloud",)
+
+    def __init__(self, cloud: "TimeCloud"):
+        self._cloud = cloud
+
+    def _ids(self) -> np.ndarray:
+        """Ids of the words in the window, in first-seen order."""
+        ring = self._cloud._ring
+        return np.unique(ring[ring >= 0])
+
+    def __getitem__(self, word: str) -> int:
+        wid = self._cloud._vocab.get(word)
+        if wid is not None:
+            count = int(self._cloud._counts[wid])
+            if count:
+                return count
+        raise KeyError(word)
+
+    def __iter__(self) -> Iterator[str]:
+        inv = self._cloud._inv
+        return (inv[wid] for wid in self._ids().tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
 
 class TimeCloud:
     """Core engine for tracking word frequencies over a sliding window.
@@ -54,11 +111,51 @@ class TimeCloud:
             config: Configuration object.
         """
         self.config = config
-        self.queue: deque[str] = deque(maxlen=config.max_queue_size)
-        self.frequencies: Counter[str] = Counter()
+        # Each distinct word is interned to an int id on first sight; the
+        # window and the counts hold ids so they fit in flat int32 arrays
+        self._vocab: dict[str, int] = {}
+        self._inv: list[str] = []
+
+        # Sliding window as a fixed-size ring buffer of word ids; _head is
+        # the slot of the oldest word, which the next word overwrites
+        # (-1 while empty). Runs of ids are pushed by _kernels; single ids
+        # go through memoryviews of the same arrays, which index as plain
+        # ints without a kernel call per word.
+        self._ring = np.full(config.max_queue_size, -1, dtype=np.int32)
+        self._ring_view = memoryview(self._ring)
+        self._head = 0
+        self._counts = np.zeros(1024, dtype=np.int32)  # Window counts by word id
+        self._counts_view = memoryview(self._counts)
+
+        # Incrementally maintained top-K (K = max_display_words), as keys
+        # (-count, word id) packed by _KEY_STRIDE and sorted ascending, so
+        # the last key is the weakest member; _top_items holds the matching
+        # (word, count) pairs. While not dirty, every word outside the top-K
+        # ranks below every member. Once dirty, it is rebuilt when next read.
+        self._top_n = config.max_display_words
+        self._top_keys: list[int] = []
+        self._top_items: list[tuple[str, int]] = []
+        self._top_dirty = False
+
+        # Window counts keyed by word, so snapshots are a dict copy. Built
+        # by the first get_frequencies(), kept current by single-word
+        # pushes, and dropped (None) by batched ones.
+        self._word_counts: dict[str, int] | None = None
+
+        self._frequencies_view = _WordFrequencies(self)
         self.total_words_processed: int = 0
         self.latest_word: str | None = None
 
+        # Single state object that process_words updates and re-yields;
+        # its top words are computed lazily from this engine
+        self._state = CloudState(
+            word_frequencies=self._frequencies_view,
+            total_words_processed=0,
+            current_queue_size=0,
+            latest_word=None,
+            _engine=weakref.ref(self),
+        )
+
     def add_word(self, word: str) -> CloudState:
         """Add a word to the sliding window and return current state.
 
@@ -71,44 +168,238 @@ class TimeCloud:
         Returns:
             Current CloudState after adding the word.
         """
-        # If queue is full, we need to evict the oldest word
-        if len(self.queue) == self.queue.maxlen:
-            evicted = self.queue[0]  # Will be removed when we append
-            self.frequencies[evicted] -= 1
-            if self.frequencies[evicted] <= 0:
-                del self.frequencies[evicted]
+        self._add_word_no_state(word)
+        return self.get_state()
 
-        # Add new word
-        self.queue.append(word)
-        self.frequencies[word] += 1
-        self.total_words_processed += 1
+    def _add_word_no_state(self, word: str) -> None:
+        """Add a word to the sliding window without building a state.
+
+        Args:
+            word: The word to add.
+        """
+        wid = self._vocab.get(word)
+        if wid is None:
+            wid = self._intern(word)
+        self._push_one(wid)
         self.latest_word = word
 
+    def process_frame(self, words: Iterable[str]) -> CloudState:
+        """Add one frame's worth of words and return the resulting state.
+
+        All the frame's evictions and additions are applied in a single
+        window update, and top words are computed once for the frame.
+
+        Args:
+            words: The words advancing this frame, in order.
+
+        Returns:
+            CloudState after all of the frame's words are added.
+        """
+        ids = [self._intern(word) for word in words]
+        if ids:
+            self._push(ids, self._inv[ids[-1]])
         return self.get_state()
 
+    def _intern(self, word: str) -> int:
+        """Get the id for a word, assigning the next free id if it is new."""
+        wid = self._vocab.get(word)
+        if wid is None:
+            wid = self._vocab[word] = len(self._inv)
+            self._inv.append(word)
+            if wid == len(self._counts):
+                # Grow geometrically so interning stays amortized O(1)
+                counts = np.zeros(2 * wid, dtype=np.int32)
+                counts[:wid] = self._counts
+                self._counts = counts
+                self._counts_view = memoryview(counts)
+        return wid
+
+    def _push(self, ids: list[int], last_word: str) -> None:
+        """Push a run of interned words through the window as one update.
+
+        Args:
+            ids: Word ids, in order.
+            last_word: The word of the last id, recorded as latest_word.
+        """
+        if len(ids) == 1:
+            self._push_one(ids[0])
+        else:
+            self._advance(np.array(ids, dtype=np.int32))
+        self.latest_word = last_word
+
+    def _push_one(self, wid: int) -> None:
+        """Push a single word id through the window, keeping the top-K current.
+
+        Plain Python: for one id, allocating an array and dispatching a
+        kernel costs more than the update itself.
+
+        Args:
+            wid: Word id to add.
+        """
+        ring = self._ring_view
+        counts = self._counts_view
+        word_counts = self._word_counts
+        head = self._head
+        evicted = ring[head]
+        ring[head] = wid
+        head += 1
+        self._head = 0 if head == len(ring) else head
+        self.total_words_processed += 1
+
+        if evicted >= 0:
+            count = counts[evicted] - 1
+            counts[evicted] = count
+            if word_counts is not None:
+                if count:
+                    word_counts[self._inv[evicted]] = count
+                else:
+                    del word_counts[self._inv[evicted]]
+            if not self._top_dirty:
+                self._top_update(evicted, count + 1, count)
+        count = counts[wid] + 1
+        counts[wid] = count
+        if word_counts is not None:
+            word_counts[self._inv[wid]] = count
+        if not self._top_dirty:
+            self._top_update(wid, count - 1, count)
+
+    def _top_update(self, wid: int, old: int, new: int) -> None:
+        """Move a word within the top-K after its count changed by one.
+
+        Args:
+            wid: Word id whose count changed.
+            old: Its count before the change.
+            new: Its count after the change.
+        """
+        keys = self._top_keys
+        # A full top-K may have outranked words outside it; otherwise it
+        # holds every word in the window
+        full = len(keys) >= self._top_n
+
+        if old:
+            key = wid - old * _KEY_STRIDE
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                items = self._top_items
+                if not new:
+                    if full:
+                        self._top_dirty = True  # Its slot may belong to a word outside
+                        return
+                    del keys[i]
+                    del items[i]
+                    return
+                # Find the new slot among the other members: a gain can
+                # only move the word forward, a loss only backward
+                key = wid - new * _KEY_STRIDE
+                if new > old:
+                    j = bisect_left(keys, key, 0, i)
+                else:
+                    j = bisect_left(keys, key, i + 1) - 1
+                    if full and j == len(keys) - 1:
+                        # Now weaker than every other member, so some word
+                        # outside may outrank it
+                        self._top_dirty = True
+                        return
+                item = (self._inv[wid], new)
+                if j == i:
+                    keys[i] = key
+                    items[i] = item
+                else:
+                    del keys[i]
+                    del items[i]
+                    keys.insert(j, key)
+                    items.insert(j, item)
+                return
+
+        if new < old:
+            return  # Words outside only need checking when they gain
+        key = wid - new * _KEY_STRIDE
+        items = self._top_items
+        if full:
+            if not keys or key > keys[-1]:
+                return
+            # Displace the weakest member
+            keys.pop()
+            items.pop()
+        i = bisect_left(keys, key)
+        keys.insert(i, key)
+        items.insert(i, (self._inv[wid], new))
+
+    def _rebuild_top(self) -> None:
+        """Recompute the top-K from the window counts."""
+        ids = top_k_ids(self._ring, self._counts, self._top_n)
+        keys = np.sort(ids - self._counts[ids].astype(np.int64) * _KEY_STRIDE)
+        inv = self._inv
+        self._top_keys = keys.tolist()
+        wids = (keys % _KEY_STRIDE).tolist()
+        counts = (-(keys // _KEY_STRIDE)).tolist()
+        self._top_items = [(inv[wid], count) for wid, count in zip(wids, counts)]
+        self._top_dirty = False
+
+    def _advance(self, ids: np.ndarray) -> None:
+        """Push a run of word ids through the sliding window.
+
+        Args:
+            ids: int32 array of word ids, in order.
+        """
+        self._head = advance_window(ids, self._ring, self._counts, self._head)
+        self.total_words_processed += len(ids)
+        self._top_dirty = True
+        self._word_counts = None
+
     def get_state(self) -> CloudState:
-        """Get the current state of the word cloud.
+        """Get a snapshot of the current state of the word cloud.
+
+        The snapshot does not change as the engine advances.
 
         Returns:
             CloudState with current frequencies and top words.
         """
-        top_words = self.frequencies.most_common(self.config.max_display_words)
+        # Copied and computed eagerly, so the snapshot stays consistent
+        top_words = self._top_words(self.config.max_display_words)
 
         return CloudState(
-            word_frequencies=dict(self.frequencies),
-            top_words=top_words,
+            word_frequencies=self.get_frequencies(),
             total_words_processed=self.total_words_processed,
-            current_queue_size=len(self.queue),
+            current_queue_size=self._queue_size(),
             latest_word=self.latest_word,
+            _top_words=top_words,
         )
 
+    def _update_state_inplace(self) -> CloudState:
+        """Overwrite the shared state object with the current state.
+
+        Top words are left to be computed if and when they are read.
+
+        Returns:
+            The shared CloudState, which later updates will overwrite.
+        """
+        state = self._state
+        state._top_words = None
+        state.total_words_processed = self.total_words_processed
+        state.current_queue_size = self._queue_size()
+        state.latest_word = self.latest_word
+        return state
+
+    def _queue_size(self) -> int:
+        """Number of words currently in the sliding window."""
+        return min(self.total_words_processed, len(self._ring))
+
     def get_frequencies(self) -> dict[str, int]:
         """Get current word frequencies.
 
         Returns:
             Dictionary mapping words to their counts in the current window.
         """
-        return dict(self.frequencies)
+        word_counts = self._word_counts
+        if word_counts is None:
+            ring = self._ring
+            ids = np.unique(ring[ring >= 0])
+            inv = self._inv
+            words = [inv[wid] for wid in ids.tolist()]
+            word_counts = dict(zip(words, self._counts[ids].tolist()))
+            self._word_counts = word_counts
+        return word_counts.copy()
 
     def get_top_words(self, n: int | None = None) -> list[tuple[str, int]]:
         """Get the top N words by frequency.
@@ -119,46 +410,104 @@ class TimeCloud:
         Returns:
             List of (word, count) tuples, sorted by frequency descending.
         """
-        if n is None:
-            n = self.config.max_display_words
-        return self.frequencies.most_common(n)
+        return self._top_words(self.config.max_display_words if n is None else n)
+
+    def _top_words(self, n: int) -> list[tuple[str, int]]:
+        """Top N (word, count) pairs in the window, by count descending.
+
+        Ties, including at the cutoff, go to the word seen first (since
+        creation or the last reset).
+        """
+        if n == self._top_n:
+            if self._top_dirty:
+                self._rebuild_top()
+            return self._top_items.copy()
+        ids = top_k_ids(self._ring, self._counts, n)
+        inv = self._inv
+        return [
+            (inv[wid], -neg)
+            for neg, wid in sorted(zip((-self._counts[ids]).tolist(), ids.tolist()))
+        ]
 
     def reset(self) -> None:
         """Reset the engine to initial state."""
-        self.queue.clear()
-        self.frequencies.clear()
+        self._ring.fill(-1)
+        self._head = 0
+        self._counts.fill(0)
+        self._vocab.clear()
+        self._inv.clear()
+        self._top_keys.clear()
+        self._top_items.clear()
+        self._top_dirty = False
+        self._word_counts = None
         self.total_words_processed = 0
         self.latest_word = None
 
-    def process_words(self, words: list[str]) -> Iterator[CloudState]:
-        """Process a list of words, yielding state after each addition.
+    def process_words(self, words: Iterable[str]) -> Iterator[CloudState]:
+        """Process words in order, yielding state once per frame.
 
-        This is the main method for generating animation frames.
+        This is the main method for generating animation frames. Each frame
+        advances config.words_per_frame words; top words are only computed
+        for the states that are yielded.
 
         Args:
-            words: List of words to process in order.
+            words: Words to process in order. May be a lazy iterator.
 
-        Yields:
-            CloudState after each word is added.
+        Returns:
+            Iterator of CloudState, one per frame (plus a final partial
+            frame, if any). The same object is updated and yielded every
+            time, so consume it before advancing (use get_state() for a
+            snapshot to keep).
         """
-        for word in words:
-            yield self.add_word(word)
+        return self.process_words_batched(words, self.config.words_per_frame)
 
     def process_words_batched(
-        self, words: list[str], batch_size: int
+        self, words: Iterable[str], batch_size: int
     ) -> Iterator[CloudState]:
         """Process words in batches, yielding state after each batch.
 
         Useful for reducing the number of frames when there are many words.
+        Each batch is interned to ids and pushed through the window in a
+        single kernel call.
 
         Args:
-            words: List of words to process.
+            words: Words to process in order. May be a lazy iterator.
             batch_size: Number of words to process per yield.
 
         Yields:
-            CloudState after each batch of words.
+            CloudState after each batch of words (and after a final
+            partial batch, if any). As with process_words, the same object
+            is updated and yielded every time.
         """
-        for i, word in enumerate(words, 1):
-            self.add_word(word)
-            if i % batch_size == 0 or i == len(words):
-                yield self.get_state()
+        vocab_get = self._vocab.get
+        intern = self._intern
+        push = self._push
+        update_state = self._update_state_inplace
+
+        if batch_size == 1:
+            # One word per state: skip the batch list
+            push_one = self._push_one
+            for word in words:
+                wid = vocab_get(word)
+                if wid is None:
+                    wid = intern(word)
+                push_one(wid)
+                self.latest_word = word
+                yield update_state()
+            return
+
+        ids: list[int] = []
+        word = None
+        for word in words:
+            wid = vocab_get(word)
+            if wid is None:
+                wid = intern(word)
+            ids.append(wid)
+            if len(ids) == batch_size:
+                push(ids, word)
+                ids.clear()
+                yield update_state()
+
+        if ids:
+            push(ids, word)
+            yield update_state()
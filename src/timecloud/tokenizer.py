@@ -1,10 +1,43 @@
 """Word tokenization and filtering."""
 
+import functools
+import hashlib
+import mmap
+import multiprocessing
+import os
+import pickle
 import re
+import string
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from .config import Config
 
+TOKEN_CACHE_VERSION = 1
+"""Bump when tokenization output changes, to invalidate cached token lists."""
+
+TOKENIZE_CACHE_SIZE = 4096
+"""Number of distinct short texts whose tokens each Tokenizer memoizes."""
+
+TOKENIZE_CACHE_MAX_CHARS = 1024
+"""Longer texts are never memoized, so the cache holds no large strings."""
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+"""Files at least this large are tokenized from a memory map, chunk by chunk."""
+
+MMAP_CHUNK_BYTES = 1024 * 1024
+"""Approximate size of each chunk decoded from a memory-mapped file."""
+
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+"""Bytes of uncached input tokenized in-process before worker processes are started."""
+
+# ASCII whitespace never occurs inside a UTF-8 sequence or a word, so it is
+# a safe place to cut a memory-mapped file into independently decoded chunks
+_CHUNK_BREAK_RE = re.compile(rb"\s")
+
 
 class Tokenizer:
     """Tokenizes text into words with configurable filtering.
@@ -24,14 +57,35 @@ class Tokenizer:
             config: Config object with tokenizer settings.
         """
         self.config = config
-        self.stopwords: set[str] = set()
+        self.stopwords: frozenset[str] = frozenset()
         self.stemmer = None
+        # Settings are copied so tokens always match the cache fingerprint,
+        # even if the config is changed after construction
+        self._lowercase = config.lowercase
+        self._min_len = config.min_word_length
+        self._filter_stopwords = config.filter_stopwords
+        # Whole words of ASCII letters only; the \b anchors reject letter
+        # runs glued to digits or non-ASCII letters (e.g. "mp3", "café")
+        self._word_re = re.compile(r"\b[a-zA-Z]+\b")
+        # ASCII fast path: blank out everything except letters, digits and
+        # "_" so split() yields the same letter runs as the regex; runs that
+        # still contain a digit or "_" are the ones \b would have rejected
+        keep = string.ascii_letters + string.digits + "_"
+        blanks = {c: " " for c in map(chr, range(128)) if c not in keep}
+        self._ascii_table = str.maketrans(blanks)
+        self._ascii_lower_table = str.maketrans(
+            {**blanks, **dict(zip(string.ascii_uppercase, string.ascii_lowercase))}
+        )
 
-        if config.filter_stopwords:
+        if self._filter_stopwords:
             self._load_stopwords()
 
         if config.enable_stemming:
             self._init_stemmer()
+        self._stemming = self.stemmer is not None
+
+        self._fingerprint = self._config_fingerprint()
+        self._tokenize_short = functools.lru_cache(TOKENIZE_CACHE_SIZE)(self._tokenize_tuple)
 
     def _load_stopwords(self) -> None:
         """Load stopwords from file."""
@@ -46,7 +100,9 @@ class Tokenizer:
                 return
 
         text = stopwords_path.read_text(encoding="utf-8")
-        self.stopwords = {word.strip().lower() for word in text.splitlines() if word.strip()}
+        self.stopwords = frozenset(
+            sys.intern(word.strip().lower()) for word in text.splitlines() if word.strip()
+        )
         print(f"Loaded {len(self.stopwords)} stopwords")
 
     def _init_stemmer(self) -> None:
@@ -58,60 +114,285 @@ class Tokenizer:
             print("Warning: NLTK not available, stemming disabled")
             self.config.enable_stemming = False
 
+    def _config_fingerprint(self) -> str:
+        """Hash of every setting that affects tokenize() output."""
+        settings = (
+            TOKEN_CACHE_VERSION,
+            self._lowercase,
+            self._min_len,
+            self._filter_stopwords,
+            type(self.stemmer).__name__ if self._stemming else None,
+        )
+        digest = hashlib.sha1(repr(settings).encode())
+        digest.update("\n".join(sorted(self.stopwords)).encode())
+        return digest.hexdigest()
+
     def tokenize(self, text: str) -> list[str]:
         """Tokenize text into a list of words.
 
+        Results for short texts (titles, captions, boilerplate) are
+        memoized, so repeated identical strings are only processed once.
+        Settings are copied from the config when the tokenizer is created,
+        so later changes to the config have no effect on any text; create
+        a new Tokenizer to apply them.
+
+        Args:
+            text: Input text to tokenize.
+
+        Returns:
+            List of processed word tokens.
+        """
+        if len(text) <= TOKENIZE_CACHE_MAX_CHARS:
+            return list(self._tokenize_short(text))
+        return self._tokenize(text)
+
+    def _tokenize_tuple(self, text: str) -> tuple[str, ...]:
+        """Tokenize into an immutable tuple, for the memoized short-text path."""
+        return tuple(self._tokenize(text))
+
+    def _tokenize(self, text: str) -> list[str]:
+        """Tokenize text without memoization.
+
         Args:
             text: Input text to tokenize.
 
         Returns:
             List of processed word tokens.
         """
-        # Lowercase if configured
-        if self.config.lowercase:
-            text = text.lower()
+        lowercase = self._lowercase
 
-        # Split on whitespace and punctuation, keeping only word characters
-        # This regex finds sequences of letters (including unicode)
-        words = re.findall(r"\b[a-zA-Z]+\b", text)
+        if text.isascii():
+            # translate() + split() runs entirely in C and folds in lowercasing
+            table = self._ascii_lower_table if lowercase else self._ascii_table
+            matches = filter(str.isalpha, text.translate(table).split())
+        else:
+            matches = self._word_re.findall(text)
+            # Lowercase only the matched tokens rather than the whole text
+            if lowercase:
+                matches = map(str.lower, matches)
 
-        # Filter by minimum length
-        words = [w for w in words if len(w) >= self.config.min_word_length]
+        return self._filter(matches)
 
-        # Filter stopwords
-        if self.config.filter_stopwords:
-            words = [w for w in words if w.lower() not in self.stopwords]
+    def _tokenize_mapped(self, filepath: Path) -> list[str]:
+        """Tokenize a large file from a memory map, one chunk at a time.
 
-        # Apply stemming
-        if self.config.enable_stemming and self.stemmer:
-            words = [self.stemmer.stem(w) for w in words]
+        Only about MMAP_CHUNK_BYTES of the file is decoded at once, so the
+        whole text and its intermediate token lists are never in memory.
 
+        Args:
+            filepath: Path to a non-empty text file.
+
+        Returns:
+            List of processed word tokens.
+        """
+        words: list[str] = []
+        with filepath.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                cut = _CHUNK_BREAK_RE.search(mm, start + MMAP_CHUNK_BYTES)
+                end = cut.end() if cut else size
+                words += self._tokenize(mm[start:end].decode("utf-8"))
+                start = end
         return words
 
+    def _filter(self, matches: Iterable[str]) -> list[str]:
+        """Apply length, stopword and stemming filters to matched words.
+
+        Args:
+            matches: Matched words, already lowercased if lowercasing is on.
+
+        Returns:
+            List of processed word tokens.
+        """
+        # Bind settings to locals for the per-token filter below
+        min_len = self._min_len
+        stopwords = self.stopwords
+        filter_stopwords = self._filter_stopwords
+        lowercase = self._lowercase
+
+        # Filter by length and stopwords, and stem, in a single pass.
+        # Stopwords always match case-insensitively. Kept tokens are
+        # interned so repeats share one string object, which keeps token
+        # lists small in memory and when pickled.
+        intern = sys.intern
+        if self._stemming:
+            stem = self.stemmer.stem
+            return [
+                intern(stem(w))
+                for w in matches
+                if len(w) >= min_len
+                and (not filter_stopwords or (w if lowercase else w.lower()) not in stopwords)
+            ]
+
+        return [
+            intern(w)
+            for w in matches
+            if len(w) >= min_len
+            and (not filter_stopwords or (w if lowercase else w.lower()) not in stopwords)
+        ]
+
     def tokenize_file(self, filepath: Path) -> list[str]:
         """Tokenize an entire file.
 
+        When config.token_cache_dir is set, results are cached on disk per
+        file and tokenizer settings, and reused while the file's mtime and
+        size are unchanged.
+
         Args:
             filepath: Path to text file.
 
         Returns:
             List of word tokens from the file.
         """
-        text = filepath.read_text(encoding="utf-8")
-        return self.tokenize(text)
+        words = self._cache_load(filepath)
+        if words is None:
+            words = self._tokenize_uncached(filepath)
+        return words
+
+    def _cache_entry(self, filepath: Path) -> tuple[Path, tuple[int, int]] | None:
+        """Cache file and (mtime_ns, size) validator for a file, if caching."""
+        cache_dir = self.config.token_cache_dir
+        if cache_dir is None:
+            return None
+        stat = filepath.stat()
+        key = hashlib.sha1(f"{filepath.resolve()}\0{self._fingerprint}".encode()).hexdigest()
+        return cache_dir / f"{key}.pkl", (stat.st_mtime_ns, stat.st_size)
+
+    def _cache_load(self, filepath: Path) -> list[str] | None:
+        """Cached tokens for a file, or None if missing or stale."""
+        entry = self._cache_entry(filepath)
+        if entry is None:
+            return None
+        cache_path, validator = entry
+        try:
+            with cache_path.open("rb") as f:
+                cached_validator, words = pickle.load(f)
+            if cached_validator == validator:
+                return words
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            pass  # Missing or unreadable entry; the caller re-tokenizes
+        return None
 
-    def tokenize_files(self, filepaths: list[Path]) -> list[str]:
-        """Tokenize multiple files in order.
+    def _tokenize_uncached(self, filepath: Path) -> list[str]:
+        """Tokenize a file, writing the result to the cache if enabled."""
+        # Stat before reading, so a concurrent edit leaves a stale validator
+        entry = self._cache_entry(filepath)
+        if filepath.stat().st_size >= MMAP_THRESHOLD:
+            words = self._tokenize_mapped(filepath)
+        else:
+            words = self.tokenize(filepath.read_text(encoding="utf-8"))
+        if entry is None:
+            return words
+
+        cache_path, validator = entry
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("wb") as f:
+                pickle.dump((validator, words), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write token cache for {filepath.name}: {e}")
+        return words
+
+    def tokenize_files(self, filepaths: Iterable[Path]) -> Iterator[str]:
+        """Tokenize multiple files in order, streaming the tokens.
+
+        With config.tokenize_workers above 1, files missing from the token
+        cache are tokenized in parallel worker processes once more than
+        PARALLEL_MIN_BYTES of them have been tokenized in-process, so small
+        corpora never pay for starting workers. Tokens are still yielded
+        file by file in order, and only a few files per worker are in flight
+        at once, so memory stays bounded when the consumer is slower than
+        tokenization.
+
+        Workers are spawned, so they import the caller's main module: a
+        script that uses more than one worker must guard its entry point
+        with ``if __name__ == "__main__":``.
 
         Args:
-            filepaths: List of file paths to tokenize, in order.
+            filepaths: File paths to tokenize, in order.
 
-        Returns:
-            Combined list of word tokens from all files.
+        Yields:
+            Word tokens from all files, in order.
         """
-        all_words = []
-        for filepath in filepaths:
-            words = self.tokenize_file(filepath)
-            all_words.extend(words)
-            print(f"Tokenized {filepath.name}: {len(words)} words")
-        return all_words
+        workers = self.config.tokenize_workers
+        if workers <= 1:
+            for filepath in filepaths:
+                yield from _report(filepath, self.tokenize_file(filepath))
+            return
+
+        pending: deque[tuple[Path, Future | list[str]]] = deque()
+        max_pending = workers * 4
+        pool = None
+        uncached_bytes = 0
+        try:
+            for filepath in filepaths:
+                words = self._cache_load(filepath)
+                if words is None and pool is None:
+                    uncached_bytes += filepath.stat().st_size
+                    if uncached_bytes < PARALLEL_MIN_BYTES:
+                        words = self._tokenize_uncached(filepath)
+                    else:
+                        # Spawned rather than forked, since a renderer's
+                        # ffmpeg and threads may already be running
+                        pool = ProcessPoolExecutor(
+                            workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_worker,
+                            initargs=(self,),
+                        )
+                if words is None:
+                    words = pool.submit(_tokenize_in_worker, filepath)
+                pending.append((filepath, words))
+                # Nothing is in flight until the pool starts
+                if pool is None or len(pending) >= max_pending:
+                    yield from _report(*pending.popleft())
+            while pending:
+                yield from _report(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def __getstate__(self) -> dict:
+        """Pickle without the stemmer or the memo cache.
+
+        The NLTK stemmer is not always picklable, and the cache wraps a
+        bound method of this instance.
+        """
+        state = self.__dict__.copy()
+        state["stemmer"] = None
+        del state["_tokenize_short"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore a pickled tokenizer, re-creating its stemmer and cache."""
+        self.__dict__.update(state)
+        if self._stemming:
+            self._init_stemmer()
+        self._tokenize_short = functools.lru_cache(TOKENIZE_CACHE_SIZE)(self._tokenize_tuple)
+
+
+def _report(filepath: Path, words: Future | list[str]) -> list[str]:
+    """Resolve a file's tokens, waiting on its worker if needed, and log the count."""
+    if isinstance(words, Future):
+        words = words.result()
+    print(f"Tokenized {filepath.name}: {len(words)} words")
+    return words
+
+
+# Per-process tokenizer for ProcessPoolExecutor workers
+_worker_tokenizer: Tokenizer | None = None
+
+
+def _init_worker(tokenizer: Tokenizer) -> None:
+    """Install the tokenizer for a tokenize pool worker."""
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer
+
+
+def _tokenize_in_worker(filepath: Path) -> list[str]:
+    """Tokenize a single file inside a pool worker."""
+    return _worker_tokenizer._tokenize_uncached(filepath)